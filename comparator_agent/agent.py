@@ -5,104 +5,163 @@ Comparator A2A Agent
 Compares HHS/CMS regulations in the current period (last N days)
 with the previous equal-length period, using the Federal Register API.
 
-Run:
-    python agent.py
+Run (from the repository root):
+    python -m comparator_agent.agent
 
 This will start an A2A agent on port 8002 with an agent card at:
     http://localhost:8002/.well-known/agent-card.json
 """
 
+import asyncio
 import datetime as dt
-from typing import List, Dict
+import io
+from collections import Counter
+from typing import List, Dict, Sequence, Tuple
+
+import orjson
+from cachetools import TLRUCache
+
+# Loads .env and checks GOOGLE_API_KEY once per process
+from shared.config import get_gemini_model
+from shared.a2a_app import lazy_app_getattr
+from shared.federal_register import (
+    AGENCY_QUERY_SLUGS,
+    DOC_FIELDS,
+    DOC_SUMMARY_TEMPLATE,
+    DOC_TYPES,
+    FR_URL,
+)
+from shared.http_client import get_client, register_client_lifecycle
 
-import requests
-import uvicorn
+# The previous window is only used for counts by type and for diffing
+# document numbers, so title/url/date are never downloaded for it.
+DIFF_FIELDS = ("document_number", "type")
 
-from google.adk.agents import LlmAgent
-from google.adk.a2a.utils.agent_to_a2a import to_a2a
-from google.adk.models.google_llm import Gemini
-from google.genai import types
-import requests
-from dotenv import load_dotenv
-from pathlib import Path
-import os
+# User-Agent sent with every Federal Register request from this agent
+USER_AGENT = "compliance-change-tracker/comparator-agent"
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-env_path = PROJECT_ROOT / ".env"
 
-# NOTE: override=True so .env value wins
-load_dotenv(dotenv_path=env_path, override=True)
+# Federal Register results only change as new documents are published, so
+# identical range queries are served from memory. Ranges that end before today
+# are immutable and kept for a day; ranges that include today for an hour.
+_CACHE_TTL_OPEN_RANGE = 60 * 60
+_CACHE_TTL_CLOSED_RANGE = 24 * 60 * 60
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-if os.environ["GOOGLE_API_KEY"] is None:
-    
-    print(
-        "\n❌ERROR: GOOGLE_API_KEY environment variable is not set. "
-        "The agent will not function properly without it.\n"
-    )
-    exit(1)
+def _docs_cache_ttu(key: Tuple, value: List[Dict], now: float) -> float:
+    end_date_iso = key[2]
+    if end_date_iso < dt.date.today().isoformat():
+        return now + _CACHE_TTL_CLOSED_RANGE
+    return now + _CACHE_TTL_OPEN_RANGE
 
-FR_URL = "https://www.federalregister.gov/api/v1/documents.json"
 
-AGENCY_SLUGS = {
-    "HHS": "health-and-human-services-department",
-    "CMS": "centers-for-medicare-medicaid-services",
-}
+_DOCS_CACHE = TLRUCache(maxsize=128, ttu=_docs_cache_ttu)
 
-retry_config = types.HttpRetryOptions(
-    attempts=5,
-    exp_base=2,
-    initial_delay=1,
-    http_status_codes=[429, 500, 503, 504],
-)
+
+# Static part of every range query; _build_params_for_range adds the dates,
+# agencies and, for the previous window, the reduced field list.
+_PARAMS_TEMPLATE = {
+    "per_page": "1000",
+    "order": "newest",
+    "conditions[type][]": DOC_TYPES,
+    "fields[]": DOC_FIELDS,
+}
 
 
 def _build_params_for_range(
-    slugs: List[str],
+    slugs: Sequence[str],
     start_date_iso: str,
     end_date_iso: str,
+    fields: Sequence[str] = DOC_FIELDS,
 ) -> Dict:
     """
-    Build query parameters for a date range [start_date, end_date].
+    Build query parameters for a date range [start_date, end_date],
+    returning only the requested `fields` for each document.
     """
-    params = {
-        "per_page": "1000",
-        "order": "newest",
-        "conditions[type][]": ["RULE", "PRORULE"],
-        "conditions[publication_date][gte]": start_date_iso,
-        "conditions[publication_date][lte]": end_date_iso,
-        "fields[]": [
-            "title",
-            "document_number",
-            "publication_date",
-            "type",
-            "html_url",
-        ],
-    }
-    for slug in slugs:
-        params.setdefault("conditions[agencies][]", [])
-        params["conditions[agencies][]"].append(slug)
+    params = _PARAMS_TEMPLATE.copy()
+    params["conditions[publication_date][gte]"] = start_date_iso
+    params["conditions[publication_date][lte]"] = end_date_iso
+    params["conditions[agencies][]"] = slugs
+    if fields is not DOC_FIELDS:
+        params["fields[]"] = tuple(fields)
     return params
 
 
-def _fetch_docs_for_range(
-    slugs: List[str],
+async def _fetch_docs_for_agency(
+    slug: str,
+    start_date_iso: str,
+    end_date_iso: str,
+    fields: Sequence[str],
+) -> List[Dict]:
+    cache_key = (slug, start_date_iso, end_date_iso, tuple(fields))
+    cached = _DOCS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
+    params = _build_params_for_range((slug,), start_date_iso, end_date_iso, fields)
+    resp = await get_client(USER_AGENT).get(FR_URL, params=params)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+    results = data.get("results", []) or []
+
+    _DOCS_CACHE[cache_key] = results
+    return results
+
+
+async def _fetch_docs_for_range(
+    slugs: Sequence[str],
     start_date: dt.date,
     end_date: dt.date,
+    fields: Sequence[str] = DOC_FIELDS,
 ) -> List[Dict]:
-    params = _build_params_for_range(
-        slugs,
-        start_date.isoformat(),
-        end_date.isoformat(),
+    """
+    Fetch documents for a date range, issuing one request per agency
+    concurrently. Each agency gets its own 1000-document page, and results
+    are merged newest-first with duplicates (documents filed under both
+    agencies) removed.
+    """
+    start_date_iso = start_date.isoformat()
+    end_date_iso = end_date.isoformat()
+
+    if len(slugs) == 1:
+        return await _fetch_docs_for_agency(
+            slugs[0], start_date_iso, end_date_iso, fields
+        )
+
+    per_agency = await asyncio.gather(
+        *(
+            _fetch_docs_for_agency(slug, start_date_iso, end_date_iso, fields)
+            for slug in slugs
+        )
     )
-    resp = requests.get(FR_URL, params=params, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
-    return data.get("results", []) or []
+
+    docs = []
+    seen = set()
+    for results in per_agency:
+        for d in results:
+            num = d.get("document_number")
+            if num not in seen:
+                seen.add(num)
+                docs.append(d)
+    docs.sort(key=lambda d: d.get("publication_date") or "", reverse=True)
+    return docs
 
 
-def compare_regulation_changes(
+def _count_types(type_counts: Counter) -> Dict[str, int]:
+    """
+    Collapse per-type document counts into final rules, proposed rules and
+    OTHER (anything that is not a final or proposed rule).
+    """
+    rules = type_counts["RULE"]
+    proposed_rules = type_counts["PRORULE"]
+    return {
+        "RULE": rules,
+        "PRORULE": proposed_rules,
+        "OTHER": sum(type_counts.values()) - rules - proposed_rules,
+    }
+
+
+async def compare_regulation_changes(
     agency: str = "BOTH",
     days_back: int = 30,
 ) -> str:
@@ -113,7 +172,7 @@ def compare_regulation_changes(
     Returns a human-readable summary string.
     """
     agency_normalized = (agency or "BOTH").upper()
-    if agency_normalized not in ("HHS", "CMS", "BOTH"):
+    if agency_normalized not in AGENCY_QUERY_SLUGS:
         agency_normalized = "BOTH"
 
     if days_back <= 0:
@@ -124,101 +183,118 @@ def compare_regulation_changes(
     previous_end = current_start - dt.timedelta(days=1)
     previous_start = previous_end - dt.timedelta(days=days_back)
 
-    if agency_normalized == "HHS":
-        slugs = [AGENCY_SLUGS["HHS"]]
-    elif agency_normalized == "CMS":
-        slugs = [AGENCY_SLUGS["CMS"]]
-    else:
-        slugs = [AGENCY_SLUGS["HHS"], AGENCY_SLUGS["CMS"]]
+    slugs = AGENCY_QUERY_SLUGS[agency_normalized]
 
+    # Both windows are independent, so issue the two requests concurrently
     try:
-        current_docs = _fetch_docs_for_range(slugs, current_start, today)
-        previous_docs = _fetch_docs_for_range(slugs, previous_start, previous_end)
+        current_docs, previous_docs = await asyncio.gather(
+            _fetch_docs_for_range(slugs, current_start, today),
+            _fetch_docs_for_range(
+                slugs, previous_start, previous_end, fields=DIFF_FIELDS
+            ),
+        )
     except Exception as e:
         return f"Error calling Federal Register API in comparator agent: {e}"
 
-    current_nums = {d.get("document_number") for d in current_docs}
-    previous_nums = {d.get("document_number") for d in previous_docs}
-
-    new_nums = current_nums - previous_nums
-
-    # Count by type
-    def _count_types(docs: List[Dict]) -> Dict[str, int]:
-        counts = {"RULE": 0, "PRORULE": 0, "OTHER": 0}
-        for d in docs:
-            t = (d.get("type") or "").upper()
-            if t in ("RULE", "PRORULE"):
-                counts[t] += 1
-            else:
-                counts["OTHER"] += 1
-        return counts
-
-    current_counts = _count_types(current_docs)
-    previous_counts = _count_types(previous_docs)
-
-    # Gather details for new docs
-    new_docs = [d for d in current_docs if d.get("document_number") in new_nums]
-
-    lines = [
-        f"Comparator analysis for {agency_normalized} regulations.",
-        "",
-        f"Current period:   {current_start.isoformat()} to {today.isoformat()} (inclusive)",
-        f"Previous period:  {previous_start.isoformat()} to {previous_end.isoformat()} (inclusive)",
-        "",
+    # One pass over each window: count types while collecting the previous
+    # document numbers, then count types while picking out the new documents.
+    previous_nums = set()
+    previous_types = Counter()
+    for d in previous_docs:
+        previous_nums.add(d.get("document_number"))
+        previous_types[(d.get("type") or "").upper()] += 1
+
+    new_docs = []
+    current_types = Counter()
+    for d in current_docs:
+        current_types[(d.get("type") or "").upper()] += 1
+        if d.get("document_number") not in previous_nums:
+            new_docs.append(d)
+
+    current_counts = _count_types(current_types)
+    previous_counts = _count_types(previous_types)
+
+    buf = io.StringIO()
+    buf.write(
+        f"Comparator analysis for {agency_normalized} regulations.\n"
+        "\n"
+        f"Current period:   {current_start.isoformat()} to {today.isoformat()} (inclusive)\n"
+        f"Previous period:  {previous_start.isoformat()} to {previous_end.isoformat()} (inclusive)\n"
+        "\n"
         f"Current period:  {len(current_docs)} document(s) "
-        f"(Final rules: {current_counts['RULE']}, Proposed rules: {current_counts['PRORULE']}, Other: {current_counts['OTHER']})",
+        f"(Final rules: {current_counts['RULE']}, Proposed rules: {current_counts['PRORULE']}, Other: {current_counts['OTHER']})\n"
         f"Previous period: {len(previous_docs)} document(s) "
-        f"(Final rules: {previous_counts['RULE']}, Proposed rules: {previous_counts['PRORULE']}, Other: {previous_counts['OTHER']})",
-        "",
-        f"Net change in total docs: {len(current_docs) - len(previous_docs)}",
-        f"New document(s) in current period that did not appear in the previous period: {len(new_docs)}",
-        "",
-    ]
+        f"(Final rules: {previous_counts['RULE']}, Proposed rules: {previous_counts['PRORULE']}, Other: {previous_counts['OTHER']})\n"
+        "\n"
+        f"Net change in total docs: {len(current_docs) - len(previous_docs)}\n"
+        f"New document(s) in current period that did not appear in the previous period: {len(new_docs)}\n"
+        "\n"
+    )
 
     if new_docs:
-        lines.append("Newly introduced document(s) in the current period:")
+        buf.write("Newly introduced document(s) in the current period:\n")
         for d in new_docs[:10]:
-            title = (d.get("title") or "").strip()
-            num = d.get("document_number", "")
-            pub_date = d.get("publication_date", "")
-            doc_type = d.get("type", "")
-            url = d.get("html_url", "")
-            lines.append(
-                f"- [{pub_date}] ({doc_type}) {num}\n"
-                f"  Title: {title}\n"
-                f"  URL: {url}"
+            buf.write(
+                DOC_SUMMARY_TEMPLATE.format(
+                    title=(d.get("title") or "").strip(),
+                    document_number=d.get("document_number", ""),
+                    publication_date=d.get("publication_date", ""),
+                    type=d.get("type", ""),
+                    html_url=d.get("html_url", ""),
+                )
             )
         if len(new_docs) > 10:
-            lines.append("")
-            lines.append(f"...and {len(new_docs) - 10} more new document(s) in the current period.")
+            buf.write("\n")
+            buf.write(f"...and {len(new_docs) - 10} more new document(s) in the current period.")
     else:
-        lines.append("No documents in the current period are new relative to the previous period.")
-
-    return "\n".join(lines)
-
-
-# LlmAgent for the comparator
-comparator_agent = LlmAgent(
-    model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
-    name="reg_change_comparator_agent",
-    description=(
-        "Agent that compares recent HHS and CMS regulations in the last N days "
-        "with the previous N days using the Federal Register API."
-    ),
-    instruction=(
-        "You expose a single tool compare_regulation_changes that compares the number and type "
-        "of HHS/CMS regulations in the last N days with the previous N-day window. "
-        "When asked for comparison or 'changes over time', ALWAYS call that tool and "
-        "return its output. Do not fabricate regulations."
-    ),
-    tools=[compare_regulation_changes],
-)
+        buf.write("No documents in the current period are new relative to the previous period.")
+
+    return buf.getvalue().rstrip("\n")
+
+
+def build_comparator_agent():
+    """
+    Build the LlmAgent for the comparator.
+    """
+    from google.adk.agents import LlmAgent
+
+    return LlmAgent(
+        model=get_gemini_model(),
+        name="reg_change_comparator_agent",
+        description=(
+            "Agent that compares recent HHS and CMS regulations in the last N days "
+            "with the previous N days using the Federal Register API."
+        ),
+        instruction=(
+            "You expose a single tool compare_regulation_changes that compares the number and type "
+            "of HHS/CMS regulations in the last N days with the previous N-day window. "
+            "When asked for comparison or 'changes over time', ALWAYS call that tool and "
+            "return its output. Do not fabricate regulations."
+        ),
+        tools=[compare_regulation_changes],
+    )
+
+
+def build_comparator_a2a_app():
+    """
+    Wrap the comparator agent as an A2A app on port 8002.
+    """
+    from google.adk.a2a.utils.agent_to_a2a import to_a2a
+
+    app = to_a2a(build_comparator_agent(), port=8002)
+    register_client_lifecycle(app, USER_AGENT)
+    return app
+
 
-# Wrap as A2A app on port 8002
-comparator_a2a_app = to_a2a(comparator_agent, port=8002)
+# Built on first access (e.g. `uvicorn comparator_agent.agent:comparator_a2a_app`)
+__getattr__ = lazy_app_getattr(globals(), "comparator_a2a_app", build_comparator_a2a_app)
 
 
 if __name__ == "__main__":
+    import uvicorn
+
+    comparator_a2a_app = build_comparator_a2a_app()
+
     print("Starting Comparator A2A agent on http://0.0.0.0:8002 ...")
     print("Agent card: http://localhost:8002/.well-known/agent-card.json")
     uvicorn.run(comparator_a2a_app, host="0.0.0.0", port=8002)
@@ -7,17 +7,22 @@ This agent:
 - Summarizes recent changes for compliance, security, and engineering
 - Optionally "sends" notifications via a simple email tool (currently just prints)
 
-Run (example):
-    python agent.py "Summarize new HHS and CMS rules from the last 30 days"
+Run (example, from the repository root):
+    python -m orchestrator_agent.agent "Summarize new HHS and CMS rules from the last 30 days"
 """
 
+from __future__ import annotations
+
 import os
 import sys
 import asyncio
+import atexit
+import threading
 import uuid
 import warnings
-from dotenv import load_dotenv
-from pathlib import Path
+from typing import TYPE_CHECKING
+
+import httpx
 
 # ---------------------------------------------------------------------------
 # 1. SUPPRESS CLEANUP NOISE
@@ -27,41 +32,101 @@ warnings.simplefilter("ignore", UserWarning)
 warnings.simplefilter("ignore")
 
 
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-env_path = PROJECT_ROOT / ".env"
+# Loads .env and checks GOOGLE_API_KEY once per process
+from shared.config import get_gemini_model
 
-# Note: override=True so .env value wins
-load_dotenv(dotenv_path=env_path, override=True)
+# ADK / GenAI and the email modules are imported where they are used, so
+# they are only loaded on the code paths that need them.
+if TYPE_CHECKING:
+    import smtplib
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if os.environ["GOOGLE_API_KEY"] is None:
-    
-    print(
-        "\n❌ERROR: GOOGLE_API_KEY environment variable is not set. "
-        "The agent will not function properly without it.\n"
-    )
-    exit(1)
-
-from google.adk.agents import LlmAgent
-from google.adk.agents.remote_a2a_agent import (
-    RemoteA2aAgent,
-    AGENT_CARD_WELL_KNOWN_PATH,
-)
-from google.adk.models.google_llm import Gemini
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.tools import FunctionTool
-from google.genai import types
-
-import smtplib
-from email.message import EmailMessage
+    from google.adk.agents import LlmAgent
+    from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
 
 # ---------------------------------------------------------------------------
 # Tools
 # ---------------------------------------------------------------------------
 DEFAULT_EMAIL_RECIPIENT = os.getenv("COMPLIANCE_EMAIL_TO", "compliance@acme.com")
 
+# Base URLs of the remote A2A agents
+REG_AGENT_URL = "http://localhost:8001"
+COMPARATOR_AGENT_URL = "http://127.0.0.1:8002"
+
+# Logged-in SMTP connection reused across emails, so only the first send pays
+# for the connect + STARTTLS + login handshake. It is tagged with the settings
+# it was opened with, so changed SMTP_* values get a fresh connection.
+_SMTP = None
+_SMTP_SETTINGS = None
+_SMTP_LOCK = threading.Lock()
+
+
+def _smtp_connect(smtp_server: str, smtp_port: int, smtp_user: str, smtp_password: str) -> smtplib.SMTP:
+    import smtplib
+
+    smtp = smtplib.SMTP(smtp_server, smtp_port)
+    try:
+        # STARTTLS for secure connection
+        smtp.starttls()
+        smtp.login(smtp_user, smtp_password)
+    except BaseException:
+        smtp.close()
+        raise
+    return smtp
+
+
+def _smtp_quit(smtp: smtplib.SMTP) -> None:
+    import smtplib
+
+    try:
+        smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        smtp.close()
+
+
+def _get_smtp(smtp_server: str, smtp_port: int, smtp_user: str, smtp_password: str) -> smtplib.SMTP:
+    """
+    Return a live, logged-in connection for these settings, reusing the cached
+    one when possible. Callers must hold _SMTP_LOCK.
+    """
+    global _SMTP, _SMTP_SETTINGS
+    import smtplib
+
+    settings = (smtp_server, smtp_port, smtp_user, smtp_password)
+    if _SMTP is not None:
+        if _SMTP_SETTINGS == settings:
+            # Servers close idle sessions (often with a 421 reply), so check
+            # the connection before handing it out again.
+            try:
+                code, _ = _SMTP.noop()
+                if code == 250:
+                    return _SMTP
+            except (smtplib.SMTPException, OSError):
+                pass
+        _discard_smtp()
+
+    _SMTP = _smtp_connect(smtp_server, smtp_port, smtp_user, smtp_password)
+    _SMTP_SETTINGS = settings
+    return _SMTP
+
+
+def _discard_smtp() -> None:
+    """
+    Quit and forget the cached connection. Callers must hold _SMTP_LOCK.
+    """
+    global _SMTP, _SMTP_SETTINGS
+    if _SMTP is not None:
+        _smtp_quit(_SMTP)
+        _SMTP = None
+        _SMTP_SETTINGS = None
+
+
+def _close_smtp() -> None:
+    with _SMTP_LOCK:
+        _discard_smtp()
+
+
+atexit.register(_close_smtp)
+
 def send_email_notification(summary: str, recipient: str = DEFAULT_EMAIL_RECIPIENT) -> str:
     """
     Send a real email with the given summary as the body.
@@ -74,6 +139,9 @@ def send_email_notification(summary: str, recipient: str = DEFAULT_EMAIL_RECIPIE
 
     Returns a short status string for logging.
     """
+    import smtplib
+    from email.message import EmailMessage
+
     GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
     
     smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -98,11 +166,16 @@ def send_email_notification(summary: str, recipient: str = DEFAULT_EMAIL_RECIPIE
     msg.set_content(summary)
 
     try:
-        with smtplib.SMTP(smtp_server, smtp_port) as smtp:
-            # STARTTLS for secure connection
-            smtp.starttls()
-            smtp.login(smtp_user, smtp_password)
-            smtp.send_message(msg)
+        with _SMTP_LOCK:
+            smtp = _get_smtp(smtp_server, smtp_port, smtp_user, smtp_password)
+            try:
+                smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # The server can still drop the session after the NOOP
+                # check; reconnect and retry once.
+                _discard_smtp()
+                smtp = _get_smtp(smtp_server, smtp_port, smtp_user, smtp_password)
+                smtp.send_message(msg)
 
         print(f"\n✅ Email sent to {recipient}\n")
         return f"Email sent to {recipient}"
@@ -111,11 +184,99 @@ def send_email_notification(summary: str, recipient: str = DEFAULT_EMAIL_RECIPIE
         return f"Email send failed: {e}"
 
 
+def _a2a_result_text(result: dict) -> str:
+    """
+    Extract the text parts from an A2A message/send result, which is either
+    a Message or a Task (whose output lives in its artifacts).
+    """
+    if result.get("kind") == "message":
+        parts = result.get("parts") or []
+    else:
+        parts = []
+        for artifact in result.get("artifacts") or []:
+            parts.extend(artifact.get("parts") or [])
+        if not parts:
+            status_message = (result.get("status") or {}).get("message") or {}
+            parts = status_message.get("parts") or []
+
+    texts = [p.get("text", "") for p in parts if p.get("kind") == "text"]
+    return "\n".join(texts).strip()
+
+
+async def _send_a2a_message(client: httpx.AsyncClient, base_url: str, text: str) -> str:
+    """
+    Send a single user message to a remote A2A agent and return its text reply.
+    """
+    payload = {
+        "jsonrpc": "2.0",
+        "id": uuid.uuid4().hex,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "messageId": uuid.uuid4().hex,
+                "parts": [{"kind": "text", "text": text}],
+            },
+        },
+    }
+    resp = await client.post(f"{base_url}/", json=payload)
+    resp.raise_for_status()
+    data = resp.json()
+    if "error" in data:
+        raise RuntimeError(data["error"].get("message", data["error"]))
+    return _a2a_result_text(data.get("result") or {})
+
+
+async def get_reg_and_comparison(agency: str = "BOTH", days_back: int = 30) -> str:
+    """
+    Fetch recent HHS/CMS regulations AND the comparison with the previous
+    period in one step, by calling both remote agents in parallel.
+
+    Args:
+        agency: "HHS", "CMS", or "BOTH"
+        days_back: Look back this many days from today
+
+    Returns:
+        The two sub-agent outputs, labelled "Recent Rules" and
+        "Change vs Previous Period".
+    """
+    reg_prompt = f"Fetch recent {agency} regulations from the last {days_back} days."
+    comparator_prompt = (
+        f"Compare {agency} regulations in the last {days_back} days with the "
+        f"previous {days_back}-day window."
+    )
+
+    async with httpx.AsyncClient(timeout=120) as client:
+        reg_text, comparator_text = await asyncio.gather(
+            _send_a2a_message(client, REG_AGENT_URL, reg_prompt),
+            _send_a2a_message(client, COMPARATOR_AGENT_URL, comparator_prompt),
+            return_exceptions=True,
+        )
+
+    # BaseException so a cancelled call (CancelledError) is reported too
+    if isinstance(reg_text, BaseException):
+        reg_text = f"Error calling hhs_cms_reg_changes_agent: {reg_text}"
+    if isinstance(comparator_text, BaseException):
+        comparator_text = f"Error calling reg_change_comparator_agent: {comparator_text}"
+
+    return (
+        "Recent Rules (from hhs_cms_reg_changes_agent):\n"
+        f"{reg_text}\n\n"
+        "Change vs Previous Period (from reg_change_comparator_agent):\n"
+        f"{comparator_text}"
+    )
+
+
 # ---------------------------------------------------------------------------
 # Builders
 # ---------------------------------------------------------------------------
 
-def build_remote_reg_agent(base_url: str = "http://localhost:8001") -> RemoteA2aAgent:
+def build_remote_reg_agent(base_url: str = REG_AGENT_URL) -> RemoteA2aAgent:
+    from google.adk.agents.remote_a2a_agent import (
+        RemoteA2aAgent,
+        AGENT_CARD_WELL_KNOWN_PATH,
+    )
+
     agent_card_url = f"{base_url}{AGENT_CARD_WELL_KNOWN_PATH}"
     return RemoteA2aAgent(
         name="hhs_cms_reg_changes_agent",
@@ -126,11 +287,16 @@ def build_remote_reg_agent(base_url: str = "http://localhost:8001") -> RemoteA2a
         agent_card=agent_card_url,
     )
 
-def build_remote_comparator_agent(base_url: str = "http://127.0.0.1:8002") -> RemoteA2aAgent:
+def build_remote_comparator_agent(base_url: str = COMPARATOR_AGENT_URL) -> RemoteA2aAgent:
     """
     Remote comparator agent that compares regulations in the last N days
     vs the previous N days.
     """
+    from google.adk.agents.remote_a2a_agent import (
+        RemoteA2aAgent,
+        AGENT_CARD_WELL_KNOWN_PATH,
+    )
+
     agent_card_url = f"{base_url}{AGENT_CARD_WELL_KNOWN_PATH}"
     return RemoteA2aAgent(
         name="reg_change_comparator_agent",
@@ -151,19 +317,16 @@ def build_orchestrator_agent(
     It uses:
     - reg_agent as a sub-agent for raw regulations
     - comparator_agent as a sub-agent for period-over-period analysis
+    - reg_and_comparison_tool to query both sub-agents in parallel
     - email_tool as a normal tool
     """
-    retry_config = types.HttpRetryOptions(
-        attempts=5,
-        exp_base=2,
-        initial_delay=1,
-        http_status_codes=[429, 500, 503, 504],
-    )
+    from google.adk.agents import LlmAgent
+    from google.adk.tools import FunctionTool
 
     instruction = """
 You are a Compliance Change Orchestrator for US healthcare organizations.
 
-You have TWO remote sub-agents and ONE special routing tool:
+You have TWO remote sub-agents and THREE tools:
 
 Sub-agents:
 1. hhs_cms_reg_changes_agent
@@ -175,14 +338,20 @@ Sub-agents:
      previous N-day window, for HHS/CMS/BOTH.
 
 Tools:
-1. transfer_to_agent
-   - This is the ONLY tool you use to delegate work to a sub-agent.
+1. get_reg_and_comparison
+   - Takes an agency ('HHS', 'CMS', or 'BOTH') and a days_back integer.
+   - Calls BOTH sub-agents in parallel and returns both of their outputs in
+     one result. This is the fastest way to get both pieces of information.
+
+2. transfer_to_agent
+   - Fallback only: use it to call a sub-agent directly when
+     get_reg_and_comparison reports an error for that sub-agent.
    - To call a sub-agent, invoke transfer_to_agent with the appropriate
      target_agent_name (either 'hhs_cms_reg_changes_agent' or
      'reg_change_comparator_agent') and a natural-language input describing
      what you want that sub-agent to do.
 
-2. send_email_notification
+3. send_email_notification
    - Sends a notification email with a text summary. The CLI wrapper already
      sends the final integrated answer by email, so you typically only use
      this tool if the user explicitly asks you to send an additional email.
@@ -190,13 +359,13 @@ Tools:
 When the user asks about recent HHS/CMS rules and a time window
 (e.g., "Summarize new HHS and CMS rules from the last 15 days"):
 
-1. FIRST, call transfer_to_agent with target_agent_name equal to
-   'hhs_cms_reg_changes_agent', asking it to retrieve regulations for the
-   specified agency and time window.
+1. Call get_reg_and_comparison ONCE with the specified agency and time
+   window. It returns both the recent regulations and the comparison with
+   the previous N-day window.
 
-2. THEN, call transfer_to_agent with target_agent_name equal to
-   'reg_change_comparator_agent', asking it to compare that same agency and
-   time window with the previous N-day window.
+2. Only if get_reg_and_comparison reports an error for one of the sub-agents,
+   fall back to transfer_to_agent for that sub-agent ('hhs_cms_reg_changes_agent'
+   for recent regulations, 'reg_change_comparator_agent' for the comparison).
 
 3. Once you have BOTH sub-agent outputs, produce a single integrated answer:
 
@@ -218,14 +387,16 @@ When the user asks about recent HHS/CMS rules and a time window
    the period, or no change vs the previous period, say so clearly.
 
 You do NOT have tools named 'hhs_cms_reg_changes_agent' or
-'reg_change_comparator_agent' directly. You must always call them via
-the transfer_to_agent tool.
+'reg_change_comparator_agent' directly. Get their outputs through
+get_reg_and_comparison; use transfer_to_agent only as the fallback
+described in step 2.
 """.strip()
     
     email_tool = FunctionTool(send_email_notification)
+    reg_and_comparison_tool = FunctionTool(get_reg_and_comparison)
 
     orchestrator = LlmAgent(
-        model=Gemini(model="gemini-2.5-flash-lite", retry_options=retry_config),
+        model=get_gemini_model(),
         name="compliance_change_orchestrator",
         description=(
             "Orchestrator that summarizes recent HHS/CMS regulatory changes, "
@@ -234,7 +405,7 @@ the transfer_to_agent tool.
         ),
         instruction=instruction,
         sub_agents=[reg_agent, comparator_agent],
-        tools=[email_tool],
+        tools=[reg_and_comparison_tool, email_tool],
     )
 
     return orchestrator
@@ -245,6 +416,10 @@ the transfer_to_agent tool.
 # ---------------------------------------------------------------------------
 
 async def run_once(prompt: str) -> None:
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+
     # 1. Build agents locally
     remote_reg_agent = build_remote_reg_agent()
     remote_comparator_agent = build_remote_comparator_agent()
@@ -284,23 +459,19 @@ async def run_once(prompt: str) -> None:
         ):
             if event.is_final_response() and event.content:
                 for part in event.content.parts:
-                    text = getattr(part, "text", None)
                     raw_text = getattr(part, "text", None)
                     if raw_text:
-                        # Convert literal "\n" sequences into actual new lines
-                        # Otherwise, these show up as "\n" characters in the output and email
-                        text = raw_text.replace("\\n", "\n")
-                   
-                        # Print to console
-                        print(text)
-                        # Accumulate for email body
-                        final_text_parts.append(text)
+                        # Accumulate for console output and email body
+                        final_text_parts.append(raw_text)
     finally:
+        # Build the full final answer text.
+        # Convert literal "\n" sequences into actual new lines once, on the
+        # joined text. Otherwise, these show up as "\n" characters in the output and email
+        final_text = "\n".join(final_text_parts).replace("\\n", "\n").strip()
+        if final_text:
+            print(final_text)
         print("------------------------------------------------------------")
 
-    # Build the full final answer text
-    final_text = "\n".join(final_text_parts).strip()
-
     if final_text:
         recipient = os.getenv("COMPLIANCE_EMAIL_TO", "compliance@example.com")
         print(f"\n📧 Sending email notification to {recipient}...\n")
@@ -318,7 +489,7 @@ def main():
             prompt = ""
 
     if not prompt:
-        print("Usage: python agent.py 'Summarize new HHS and CMS rules from the last 30 days'")
+        print("Usage: python -m orchestrator_agent.agent 'Summarize new HHS and CMS rules from the last 30 days'")
         sys.exit(1)
 
     try:
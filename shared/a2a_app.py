@@ -0,0 +1,33 @@
+# Copyright (c) 2025, Sandip Lahiri. All rights reserved.
+"""
+Lazy A2A app attributes for the agent modules.
+
+Each A2A agent module exposes its ASGI app as a module attribute (so it can be
+served with e.g. `uvicorn fr_agent.agent:fr_a2a_app`), but only builds it on
+first access, so importing the module for its tool alone does not load ADK.
+"""
+
+from typing import Any, Callable, Dict
+
+
+def lazy_app_getattr(
+    module_globals: Dict[str, Any],
+    attr_name: str,
+    build: Callable[[], Any],
+) -> Callable[[str], Any]:
+    """
+    Return a module-level `__getattr__` that builds `attr_name` with `build()`
+    on first access and stores it in `module_globals`, so later lookups are
+    ordinary attribute reads.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name == attr_name:
+            app = build()
+            module_globals[name] = app
+            return app
+        raise AttributeError(
+            f"module {module_globals['__name__']!r} has no attribute {name!r}"
+        )
+
+    return __getattr__
@@ -0,0 +1,62 @@
+# Copyright (c) 2025, Sandip Lahiri. All rights reserved.
+"""
+Shared configuration for the compliance change tracker agents.
+
+Loads the project .env once per process and exposes the Gemini API key,
+the model retry policy and a single Gemini model instance that every
+agent module reuses instead of building its own. The Google ADK/GenAI
+modules are only imported when the model is first requested.
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from google.adk.models.google_llm import Gemini
+    from google.genai import types
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+env_path = PROJECT_ROOT / ".env"
+
+# NOTE: override=True so .env value wins
+load_dotenv(dotenv_path=env_path, override=True)
+
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+if GOOGLE_API_KEY is None:
+    print(
+        "\n❌ERROR: GOOGLE_API_KEY environment variable is not set. "
+        "The agent will not function properly without it.\n"
+    )
+    exit(1)
+
+MODEL_NAME = "gemini-2.5-flash-lite"
+
+
+@lru_cache(maxsize=None)
+def get_retry_config() -> "types.HttpRetryOptions":
+    """
+    Return the retry behavior for Gemini calls.
+    """
+    from google.genai import types
+
+    return types.HttpRetryOptions(
+        attempts=5,
+        exp_base=2,
+        initial_delay=1,
+        http_status_codes=[429, 500, 503, 504],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_gemini_model() -> "Gemini":
+    """
+    Return the process-wide Gemini model used by the agents.
+    """
+    from google.adk.models.google_llm import Gemini
+
+    return Gemini(model=MODEL_NAME, retry_options=get_retry_config())
@@ -0,0 +1,39 @@
+# Copyright (c) 2025, Sandip Lahiri. All rights reserved.
+"""
+Federal Register constants shared by the regulation agents.
+"""
+
+# Federal Register endpoint for documents
+FR_URL = "https://www.federalregister.gov/api/v1/documents.json"
+
+# Agency slugs as used by FederalRegister.gov
+AGENCY_SLUGS = {
+    "HHS": "health-and-human-services-department",
+    "CMS": "centers-for-medicare-medicaid-services",
+}
+
+# Agency slugs to query for each accepted `agency` value, built once
+AGENCY_QUERY_SLUGS = {
+    "HHS": (AGENCY_SLUGS["HHS"],),
+    "CMS": (AGENCY_SLUGS["CMS"],),
+    "BOTH": (AGENCY_SLUGS["HHS"], AGENCY_SLUGS["CMS"]),
+}
+
+# Document types queried by the agents: Final Rules and Proposed Rules
+DOC_TYPES = ("RULE", "PRORULE")
+
+# Fields needed to display a document
+DOC_FIELDS = (
+    "title",
+    "document_number",
+    "publication_date",
+    "type",
+    "html_url",
+)
+
+# Summary entry for one document
+DOC_SUMMARY_TEMPLATE = (
+    "- [{publication_date}] ({type}) {document_number}\n"
+    "  Title: {title}\n"
+    "  URL: {html_url}\n"
+)
@@ -0,0 +1,54 @@
+# Copyright (c) 2025, Sandip Lahiri. All rights reserved.
+"""
+Shared HTTP client for the Federal Register agents.
+
+Each agent gets one HTTP/2 httpx.AsyncClient per User-Agent. Its keep-alive
+connections (and their TLS sessions) are reused across tool invocations, and
+concurrent requests are multiplexed over them. The client is opened when the
+A2A app starts and closed when it shuts down, so it lives on the server's
+event loop.
+"""
+
+from typing import Dict
+
+import httpx
+
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_client(user_agent: str) -> httpx.AsyncClient:
+    """
+    Return the shared client for `user_agent`, creating it on first use.
+    """
+    client = _CLIENTS.get(user_agent)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            http2=True,
+            timeout=30,
+            limits=httpx.Limits(max_keepalive_connections=8),
+            headers={"User-Agent": user_agent},
+        )
+        _CLIENTS[user_agent] = client
+    return client
+
+
+async def close_clients() -> None:
+    """
+    Close every shared client.
+    """
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def register_client_lifecycle(app, user_agent: str) -> None:
+    """
+    Open the shared client when the ASGI `app` starts and close it on shutdown.
+    """
+
+    async def _open_client() -> None:
+        get_client(user_agent)
+
+    app.add_event_handler("startup", _open_client)
+    app.add_event_handler("shutdown", close_clients)